@@ -5,7 +5,7 @@ echo "⚡ ULTRA-FAST WARP MANAGER DEPLOYMENT"
 echo "===================================="
 
 # Quick dependency install
-pip install --break-system-packages zstandard requests schedule 2>/dev/null
+pip install --break-system-packages zstandard requests 2>/dev/null
 
 # Test basic functionality
 echo ""
@@ -16,7 +16,7 @@ sudo apt install -y python3 python3-pip python3-venv python3-gi python3-gi-cairo
 
 # Install Python dependencies
 echo "📚 Installing Python dependencies..."
-pip install --break-system-packages zstandard keyring requests schedule
+pip install --break-system-packages zstandard keyring requests fastcdc
 
 # Make scripts executable
 chmod +x warp-manager.py warp-manager-enhanced.py
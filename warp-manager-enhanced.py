@@ -3,25 +3,33 @@
 WARP Data Manager Enhanced - GitHub Integration + Scheduler
 Professional WARP Terminal data backup with remote sync and automation.
 """
+import io
 import os
 import sys
 import json
 import shutil
 import sqlite3
+import stat
 import tarfile
+import tempfile
 import zstandard as zstd
 import hashlib
+import mmap
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import base64
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 import threading
 import webbrowser
 from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import time
-import schedule
+import asyncio
 
 try:
     import gi
@@ -37,6 +45,34 @@ try:
 except ImportError:
     KEYRING_AVAILABLE = False
 
+try:
+    from fastcdc import fastcdc
+    FASTCDC_AVAILABLE = True
+except ImportError:
+    FASTCDC_AVAILABLE = False
+
+# Upload chunk size must be a multiple of 3 so base64 chunks concatenate cleanly
+UPLOAD_CHUNK_SIZE = 3 * 256 * 1024
+# Backups above this size are pushed through Git LFS instead of the blob API
+LFS_THRESHOLD = 50 * 1024 * 1024
+# The Contents API serves LFS-tracked files as pointer files starting with this line
+LFS_POINTER_PREFIX = b"version https://git-lfs.github.com/spec/v1"
+# Concurrent uploads in sync_all_to_github; also sizes the HTTP connection pool
+UPLOAD_CONCURRENCY = 6
+# How long a successful/failed connection test is trusted, in seconds
+CONNECTION_CHECK_TTL = 300
+# SQLite side files folded into database snapshots rather than archived raw
+SQLITE_SIDECAR_SUFFIXES = ("-wal", "-shm", "-journal")
+# Small text members compress better at a higher level than the binary/SQLite ones
+TEXT_SUFFIXES = {".md", ".json", ".log", ".txt", ".toml", ".yaml", ".yml"}
+# Content-defined chunk bounds for incremental backups (fixed-size reads without fastcdc)
+CHUNK_MIN_SIZE = 256 * 1024
+CHUNK_AVG_SIZE = 1024 * 1024
+CHUNK_MAX_SIZE = 4 * 1024 * 1024
+# Skippable zstd frame magic for the dictionary older archives embedded at their start
+DICT_FRAME_MAGIC = 0x184D2A5D
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
 @dataclass
 class BackupManifest:
     """Enhanced backup manifest with GitHub metadata"""
@@ -53,6 +89,109 @@ class BackupManifest:
     github_url: Optional[str] = None
     github_sha: Optional[str] = None
 
+class ZstdFrameWriter(io.RawIOBase):
+    """Writable stream compressing into consecutive zstd frames, one compressor per frame"""
+    
+    def __init__(self, fileobj, cctx: zstd.ZstdCompressor):
+        self.fileobj = fileobj
+        self.writer = cctx.stream_writer(fileobj, closefd=False, write_return_read=True)
+        self.pending = False
+        self.position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        """Uncompressed bytes written so far (tarfile's 'w' mode tracks its offset with it)"""
+        return self.position
+    
+    def write(self, data) -> int:
+        self.pending = True
+        written = self.writer.write(data)
+        self.position += written
+        return written
+    
+    def switch(self, cctx: zstd.ZstdCompressor):
+        """End the current frame and continue the stream with a new compressor"""
+        if self.pending:
+            self.writer.flush(zstd.FLUSH_FRAME)
+        self.writer = cctx.stream_writer(self.fileobj, closefd=False, write_return_read=True)
+        self.pending = False
+    
+    def close(self):
+        if not self.closed:
+            self.writer.close()
+        super().close()
+
+def iter_chunks(path: Path):
+    """Yield the content-defined chunks of a file as bytes"""
+    if FASTCDC_AVAILABLE:
+        for chunk in fastcdc(str(path), CHUNK_MIN_SIZE, CHUNK_AVG_SIZE, CHUNK_MAX_SIZE, fat=True):
+            yield chunk.data
+        return
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(CHUNK_AVG_SIZE)
+            if not data:
+                return
+            yield data
+
+class ChunkStore:
+    """Content-addressed store of zstd-compressed chunks under objects/<sha256>.zst"""
+    
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cctx = zstd.ZstdCompressor(level=3)
+        self.dctx = zstd.ZstdDecompressor()
+    
+    def path_for(self, sha: str) -> Path:
+        return self.root / f"{sha}.zst"
+    
+    def has(self, sha: str) -> bool:
+        return self.path_for(sha).exists()
+    
+    def put(self, data: bytes) -> Tuple[str, bool]:
+        """Store a chunk once and return (sha256, whether it was newly written)"""
+        sha = hashlib.sha256(data).hexdigest()
+        path = self.path_for(sha)
+        if path.exists():
+            return sha, False
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(self.cctx.compress(data))
+        os.replace(tmp_path, path)
+        return sha, True
+    
+    def get(self, sha: str) -> bytes:
+        return self.dctx.decompress(self.path_for(sha).read_bytes())
+
+def archive_dict_id(path: Path) -> int:
+    """Dict id an archive's first frame references; 0 if it needs no stored dictionary"""
+    with open(path, 'rb') as f:
+        header = f.read(18)
+    # Empty archives and ones carrying their own dictionary frame need nothing from dicts/
+    if len(header) < 18 or int.from_bytes(header[:4], "little") == DICT_FRAME_MAGIC:
+        return 0
+    return zstd.get_frame_parameters(header).dict_id
+
+def read_archive_dict(f, dict_dir: Path) -> Optional[zstd.ZstdCompressionDict]:
+    """Return the dictionary an archive was compressed with (embedded copy, else
+    dict_dir/<dict_id>.zdict by frame dict id); leaves f at the start of the archive"""
+    try:
+        header = f.read(8)
+        if len(header) == 8 and int.from_bytes(header[:4], "little") == DICT_FRAME_MAGIC:
+            return zstd.ZstdCompressionDict(f.read(int.from_bytes(header[4:], "little")))
+        f.seek(0)
+        dict_id = zstd.get_frame_parameters(f.read(18)).dict_id
+    finally:
+        f.seek(0)
+    if not dict_id:
+        return None
+    dict_path = dict_dir / f"{dict_id}.zdict"
+    if not dict_path.exists():
+        raise FileNotFoundError(f"archive needs zstd dictionary {dict_id}, not found in {dict_dir}")
+    return zstd.ZstdCompressionDict(dict_path.read_bytes())
+
 class GitHubSync:
     """GitHub repository backup sync"""
     
@@ -60,6 +199,28 @@ class GitHubSync:
         self.token = None
         self.repo_owner = None
         self.repo_name = None
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28"
+        })
+        # One kept-alive connection per concurrent upload, all to api.github.com;
+        # idempotent requests are retried on transient gateway errors
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=2, pool_maxsize=UPLOAD_CONCURRENCY, pool_block=True,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        ))
+        self.session.hooks["response"].append(self._on_response)
+        self._conn_ok: Optional[bool] = None
+        self._conn_checked_at: float = 0
+        # url -> (ETag, parsed body) for conditional GETs
+        self._etags: Dict[str, tuple] = {}
+        # Serializes ref updates so concurrent uploads don't race on main
+        self._ref_lock = threading.Lock()
+        # Dictionary files known to be in the repo; each is uploaded once
+        self._remote_dicts: Set[str] = set()
+        self._dict_lock = threading.Lock()
+        self.mirror_dir = Path.home() / ".warp-backups" / ".github-mirror"
         self.load_config()
     
     def load_config(self):
@@ -72,6 +233,7 @@ class GitHubSync:
                     self.token = config.get("github_token")
                     self.repo_owner = config.get("github_owner")
                     self.repo_name = config.get("github_repo", "warp-backups")
+                    self.session.headers["Authorization"] = f"Bearer {self.token}"
             except Exception as e:
                 print(f"Config load error: {e}")
     
@@ -93,45 +255,62 @@ class GitHubSync:
         self.token = token
         self.repo_owner = owner
         self.repo_name = repo
+        self.session.headers["Authorization"] = f"Bearer {self.token}"
+        self._conn_ok = None
+    
+    def _on_response(self, response, *args, **kwargs):
+        """Drop the cached connection state when GitHub rejects a request"""
+        if response.status_code in (401, 403, 404):
+            self._conn_ok = None
+    
+    def _conditional_get(self, url: str, timeout: int = 10):
+        """GET with If-None-Match, serving 304 Not Modified from the last body seen"""
+        cached = self._etags.get(url)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        response = self.session.get(url, headers=headers, timeout=timeout)
+        
+        if response.status_code == 304 and cached:
+            return 200, cached[1]
+        if response.status_code == 200:
+            data = response.json()
+            etag = response.headers.get("ETag")
+            if etag:
+                self._etags[url] = (etag, data)
+            return 200, data
+        
+        self._etags.pop(url, None)
+        return response.status_code, None
     
     def test_connection(self) -> bool:
-        """Test GitHub API connection"""
+        """Test GitHub API connection (cached for CONNECTION_CHECK_TTL seconds)"""
         if not self.token or not self.repo_owner:
             return False
         
-        headers = {
-            "Authorization": f"token {self.token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        if self._conn_ok is not None and time.monotonic() - self._conn_checked_at < CONNECTION_CHECK_TTL:
+            return self._conn_ok
         
         try:
-            response = requests.get(
-                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}",
-                headers=headers,
-                timeout=10
+            status, _ = self._conditional_get(
+                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}"
             )
-            return response.status_code == 200
         except Exception:
             return False
+        
+        self._conn_ok = status == 200
+        self._conn_checked_at = time.monotonic()
+        return self._conn_ok
     
     def create_repo_if_needed(self) -> bool:
         """Create private backup repo if it doesn't exist"""
         if not self.token:
             return False
         
-        headers = {
-            "Authorization": f"token {self.token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
         # Check if repo exists
         try:
-            response = requests.get(
-                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}",
-                headers=headers,
-                timeout=10
+            status, _ = self._conditional_get(
+                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}"
             )
-            if response.status_code == 200:
+            if status == 200:
                 return True
         except Exception:
             pass
@@ -144,9 +323,8 @@ class GitHubSync:
                 "description": "Private WARP Terminal backup repository",
                 "auto_init": True
             }
-            response = requests.post(
+            response = self.session.post(
                 "https://api.github.com/user/repos",
-                headers=headers,
                 json=data,
                 timeout=30
             )
@@ -160,89 +338,339 @@ class GitHubSync:
             return None
         
         try:
-            # Read backup file
-            with open(backup_path, 'rb') as f:
-                content = base64.b64encode(f.read()).decode()
-            
-            # Upload to GitHub
-            headers = {
-                "Authorization": f"token {self.token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            data = {
-                "message": f"Backup: {backup_path.name}",
-                "content": content,
-                "branch": "main"
-            }
-            
-            response = requests.put(
-                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/contents/backups/{backup_path.name}",
-                headers=headers,
-                json=data,
-                timeout=300  # 5 minute timeout for large files
+            # The archive references its dictionary by id; make sure the repo has it
+            dict_id = archive_dict_id(backup_path)
+            if dict_id and not self._upload_dict(backup_path.parent / "dicts" / f"{dict_id}.zdict"):
+                return None
+            if backup_path.stat().st_size > LFS_THRESHOLD and shutil.which("git-lfs"):
+                with self._ref_lock:
+                    return self._upload_via_lfs(backup_path)
+            return self._upload_via_git_data(backup_path)
+        except Exception as e:
+            print(f"Upload error: {e}")
+            return None
+    
+    def _upload_dict(self, dict_path: Path) -> bool:
+        """Upload a trained dictionary to dicts/ unless the repo already has it"""
+        with self._dict_lock:
+            if dict_path.name in self._remote_dicts:
+                return True
+            response = self.session.get(
+                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/contents/dicts/{dict_path.name}",
+                timeout=10
             )
-            
-            if response.status_code in [200, 201]:
-                return response.json()
-            else:
-                print(f"GitHub upload failed: {response.status_code}")
+            if response.status_code != 200:
+                if not dict_path.exists():
+                    print(f"Dictionary {dict_path.name} missing locally and on GitHub")
+                    return False
+                if not self.upload_files({f"dicts/{dict_path.name}": dict_path}, f"Dictionary: {dict_path.name}"):
+                    return False
+            self._remote_dicts.add(dict_path.name)
+            return True
+    
+    def _stream_blob_body(self, backup_path: Path):
+        """Yield a blob JSON body, base64-encoding the file chunk by chunk"""
+        yield b'{"encoding": "base64", "content": "'
+        with open(backup_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+                yield base64.b64encode(chunk)
+        yield b'"}'
+    
+    def _upload_via_git_data(self, backup_path: Path) -> Optional[Dict]:
+        """Upload backup as blob + tree + commit through the Git Data API"""
+        api = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/git"
+        
+        blob_sha = self._create_blob(api, backup_path)
+        if not blob_sha:
+            return None
+        
+        with self._ref_lock:
+            commit = self._commit_blobs(
+                api, {f"backups/{backup_path.name}": blob_sha}, f"Backup: {backup_path.name}"
+            )
+        return {"commit": commit, "blob_sha": blob_sha} if commit else None
+    
+    def upload_files(self, files: Dict[str, Path], message: str) -> Optional[Dict]:
+        """Upload several files (repo path -> local path) as a single commit"""
+        if not self.test_connection():
+            return None
+        
+        api = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/git"
+        try:
+            with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+                blob_shas = list(executor.map(lambda p: self._create_blob(api, p), files.values()))
+            if not all(blob_shas):
                 return None
-                
+            
+            with self._ref_lock:
+                commit = self._commit_blobs(api, dict(zip(files.keys(), blob_shas)), message)
+            return {"commit": commit} if commit else None
         except Exception as e:
             print(f"Upload error: {e}")
             return None
     
+    def _create_blob(self, api: str, path: Path) -> Optional[str]:
+        """Stream a file into a Git blob and return its sha"""
+        # Generator body is sent with chunked transfer encoding
+        response = self.session.post(
+            f"{api}/blobs",
+            headers={"Content-Type": "application/json"},
+            data=self._stream_blob_body(path),
+            timeout=300  # 5 minute timeout for large files
+        )
+        if response.status_code != 201:
+            print(f"GitHub blob upload failed: {response.status_code}")
+            return None
+        return response.json()["sha"]
+    
+    def _commit_blobs(self, api: str, entries: Dict[str, str], message: str) -> Optional[Dict]:
+        """Commit uploaded blobs (repo path -> blob sha) on top of main and advance it"""
+        # Resolve current head of main
+        response = self.session.get(f"{api}/ref/heads/main", timeout=10)
+        if response.status_code != 200:
+            print(f"GitHub ref lookup failed: {response.status_code}")
+            return None
+        parent_sha = response.json()["object"]["sha"]
+        
+        response = self.session.get(f"{api}/commits/{parent_sha}", timeout=10)
+        if response.status_code != 200:
+            print(f"GitHub commit lookup failed: {response.status_code}")
+            return None
+        base_tree = response.json()["tree"]["sha"]
+        
+        response = self.session.post(
+            f"{api}/trees",
+            json={
+                "base_tree": base_tree,
+                "tree": [
+                    {"path": path, "mode": "100644", "type": "blob", "sha": blob_sha}
+                    for path, blob_sha in entries.items()
+                ]
+            },
+            timeout=30
+        )
+        if response.status_code != 201:
+            print(f"GitHub tree creation failed: {response.status_code}")
+            return None
+        tree_sha = response.json()["sha"]
+        
+        response = self.session.post(
+            f"{api}/commits",
+            json={
+                "message": message,
+                "tree": tree_sha,
+                "parents": [parent_sha]
+            },
+            timeout=30
+        )
+        if response.status_code != 201:
+            print(f"GitHub commit failed: {response.status_code}")
+            return None
+        commit = response.json()
+        
+        response = self.session.patch(
+            f"{api}/refs/heads/main",
+            json={"sha": commit["sha"]},
+            timeout=30
+        )
+        if response.status_code != 200:
+            print(f"GitHub ref update failed: {response.status_code}")
+            return None
+        
+        return commit
+    
+    def _git(self, *args: str, **kwargs) -> subprocess.CompletedProcess:
+        """Run git in the LFS mirror, authenticating through the environment"""
+        # Credentials travel as an http.extraHeader in env config, never in argv or .git/config
+        auth = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+        env = {
+            **os.environ,
+            "GIT_LFS_SKIP_SMUDGE": "1",
+            "GIT_TERMINAL_PROMPT": "0",
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.https://github.com/.extraheader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {auth}",
+        }
+        kwargs.setdefault("cwd", self.mirror_dir)
+        try:
+            return subprocess.run(["git", *args], check=True, capture_output=True, text=True, env=env, **kwargs)
+        except subprocess.CalledProcessError as e:
+            output = (e.stderr or e.stdout or "").strip()
+            for secret in (self.token, auth):
+                output = output.replace(secret, "***")
+            raise RuntimeError(f"git {args[0]} failed: {output}") from None
+    
+    def _upload_via_lfs(self, backup_path: Path) -> Optional[Dict]:
+        """Push a large backup through Git LFS using a warm local mirror"""
+        remote = f"https://github.com/{self.repo_owner}/{self.repo_name}.git"
+        
+        if not (self.mirror_dir / ".git").exists():
+            self.mirror_dir.parent.mkdir(parents=True, exist_ok=True)
+            self._git("clone", "--depth", "1", "--branch", "main", remote, str(self.mirror_dir), cwd=None)
+            self._git("lfs", "install", "--local")
+            self._git("lfs", "track", "backups/*.tar.zst")
+        else:
+            # Older mirrors were cloned with the token embedded in the remote URL
+            self._git("remote", "set-url", "origin", remote)
+            self._git("pull", "--ff-only", "origin", "main")
+        
+        dest = self.mirror_dir / "backups" / backup_path.name
+        dest.parent.mkdir(exist_ok=True)
+        shutil.copy2(backup_path, dest)
+        
+        self._git("add", ".gitattributes", str(dest))
+        self._git(
+            "-c", "user.name=WARP Data Manager", "-c", "user.email=warp-data-manager@users.noreply.github.com",
+            "commit", "-m", f"Backup: {backup_path.name}"
+        )
+        try:
+            self._git("push", "origin", "HEAD:main")
+        except RuntimeError:
+            # Leave the mirror on the remote head so the next upload starts clean
+            self._git("reset", "--hard", "origin/main")
+            raise
+        
+        # Drop the local copy and the pushed LFS objects; the remote keeps them
+        dest.unlink()
+        commit_sha = self._git("rev-parse", "HEAD").stdout.strip()
+        try:
+            self._git("lfs", "prune")
+        except RuntimeError as e:
+            print(f"LFS prune warning: {e}")
+        return {"commit": {"sha": commit_sha}, "lfs": True}
+    
     def list_remote_backups(self) -> List[Dict]:
         """List backups in GitHub repo"""
         if not self.test_connection():
             return []
         
-        headers = {
-            "Authorization": f"token {self.token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
         try:
-            response = requests.get(
-                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/contents/backups",
-                headers=headers,
-                timeout=10
+            status, backups = self._conditional_get(
+                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/contents/backups"
             )
-            
-            if response.status_code == 200:
-                return response.json()
-            return []
+            return backups if status == 200 else []
         except Exception:
             return []
     
     def download_backup(self, filename: str, local_path: Path) -> bool:
-        """Download backup from GitHub"""
+        """Download backup from GitHub, plus the dictionary it was compressed with"""
         if not self.test_connection():
             return False
+        if not self._download_file(f"backups/{filename}", local_path):
+            return False
         
-        headers = {
-            "Authorization": f"token {self.token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
         try:
-            response = requests.get(
-                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/contents/backups/{filename}",
-                headers=headers,
+            dict_id = archive_dict_id(local_path)
+        except zstd.ZstdError as e:
+            print(f"Downloaded {filename} is not a zstd archive: {e}")
+            local_path.unlink()
+            return False
+        dict_path = local_path.parent / "dicts" / f"{dict_id}.zdict"
+        if dict_id and not dict_path.exists():
+            dict_path.parent.mkdir(exist_ok=True)
+            if not self._download_file(f"dicts/{dict_path.name}", dict_path):
+                print(f"Backup needs dictionary {dict_path.name}, which could not be downloaded")
+                return False
+        return True
+    
+    def _download_file(self, repo_path: str, local_path: Path) -> bool:
+        """Stream one file from the repo to local_path"""
+        # Raw media type streams the file bytes instead of a base64 JSON payload
+        try:
+            with self.session.get(
+                f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/contents/{repo_path}",
+                headers={"Accept": "application/vnd.github.raw"},
+                stream=True,
                 timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                content = base64.b64decode(data['content'])
+            ) as response:
+                if response.status_code != 200:
+                    return False
                 
                 with open(local_path, 'wb') as f:
-                    f.write(content)
-                return True
+                    for chunk in response.iter_content(chunk_size=UPLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+            
+            # Backups pushed through LFS come back as a pointer; fetch the object it names
+            if local_path.stat().st_size < 1024:
+                pointer = local_path.read_bytes()
+                if pointer.startswith(LFS_POINTER_PREFIX) and not self._download_lfs_object(pointer, local_path):
+                    local_path.unlink()
+                    return False
+            return True
+        except Exception as e:
+            print(f"Download of {repo_path} failed: {e}")
+            if local_path.exists():
+                local_path.unlink()
             return False
-        except Exception:
+    
+    def _download_lfs_object(self, pointer: bytes, local_path: Path) -> bool:
+        """Replace an LFS pointer file with its object, fetched through the LFS batch API"""
+        fields = dict(line.split(" ", 1) for line in pointer.decode().splitlines() if " " in line)
+        oid = fields["oid"].split(":", 1)[1]
+        response = self.session.post(
+            f"https://github.com/{self.repo_owner}/{self.repo_name}.git/info/lfs/objects/batch",
+            json={
+                "operation": "download",
+                "transfers": ["basic"],
+                "objects": [{"oid": oid, "size": int(fields["size"])}]
+            },
+            headers={"Accept": "application/vnd.git-lfs+json", "Content-Type": "application/vnd.git-lfs+json"},
+            auth=("x-access-token", self.token),
+            timeout=30
+        )
+        if response.status_code != 200:
+            print(f"GitHub LFS batch request failed: {response.status_code}")
+            return False
+        obj = response.json()["objects"][0]
+        download = obj.get("actions", {}).get("download")
+        if not download:
+            print(f"GitHub LFS object unavailable: {obj.get('error', {}).get('message', oid)}")
+            return False
+        
+        # The href is pre-signed storage; don't send the GitHub token along
+        digest = hashlib.sha256()
+        with requests.get(download["href"], headers=download.get("header", {}), stream=True, timeout=300) as response:
+            if response.status_code != 200:
+                print(f"GitHub LFS download failed: {response.status_code}")
+                return False
+            with open(local_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=UPLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+        if digest.hexdigest() != oid:
+            print(f"GitHub LFS object {oid} failed its checksum")
             return False
+        return True
+
+@functools.lru_cache(maxsize=1)
+def get_warp_paths(platform: str, home: Path) -> Dict[str, Path]:
+    """Get WARP paths for the given OS (cached: the layout never changes within a process)"""
+    if platform == "linux":
+        return {
+            "config": home / ".config" / "warp-terminal",
+            "state": home / ".local" / "state" / "warp-terminal", 
+            "cache": home / ".cache" / "warp-terminal",
+            "profiles": home / ".warp_profiles",
+            "cloudflare": home / ".local" / "share" / "cloudflare-warp-gui"
+        }
+    elif platform == "darwin":
+        return {
+            "config": home / "Library" / "Application Support" / "warp-terminal",
+            "state": home / "Library" / "Application Support" / "warp-terminal" / "state",
+            "cache": home / "Library" / "Caches" / "warp-terminal",
+            "profiles": home / ".warp_profiles"
+        }
+    elif platform.startswith("win"):
+        appdata = Path(os.getenv("APPDATA", home / "AppData" / "Roaming"))
+        localappdata = Path(os.getenv("LOCALAPPDATA", home / "AppData" / "Local"))
+        return {
+            "config": appdata / "warp-terminal",
+            "state": localappdata / "warp-terminal",
+            "cache": localappdata / "warp-terminal" / "cache",
+            "profiles": home / ".warp_profiles"
+        }
+    else:
+        return {}
 
 class WARPScheduler:
     """Automated backup scheduler"""
@@ -251,20 +679,32 @@ class WARPScheduler:
         self.manager = manager
         self.github = GitHubSync()
         self.running = False
-        self.thread = None
+        # (weekday or None for daily, "HH:MM", job)
+        self.jobs = []
+        self._loop = None
+        self._tasks = []
     
     def schedule_daily_backup(self, time_str: str = "02:00"):
         """Schedule daily backup at specified time"""
-        schedule.clear()
-        schedule.every().day.at(time_str).do(self.run_scheduled_backup)
+        self.jobs = [(None, time_str, self.run_scheduled_backup)]
         print(f"Scheduled daily backup at {time_str}")
     
     def schedule_weekly_backup(self, day: str = "sunday", time_str: str = "03:00"):
         """Schedule weekly backup"""
-        schedule.clear()
-        getattr(schedule.every(), day.lower()).at(time_str).do(self.run_scheduled_snapshot)
+        self.jobs = [(WEEKDAYS.index(day.lower()), time_str, self.run_scheduled_snapshot)]
         print(f"Scheduled weekly snapshot on {day} at {time_str}")
     
+    @staticmethod
+    def _next_run(weekday: Optional[int], time_str: str, now: datetime) -> datetime:
+        """Next local time matching HH:MM (and weekday, if given) strictly after now"""
+        hour, minute = map(int, time_str.split(":"))
+        run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if weekday is not None:
+            run += timedelta(days=(weekday - run.weekday()) % 7)
+        if run <= now:
+            run += timedelta(days=1 if weekday is None else 7)
+        return run
+    
     def run_scheduled_backup(self):
         """Execute scheduled backup"""
         print("Running scheduled backup...")
@@ -274,6 +714,7 @@ class WARPScheduler:
             print("Uploading to GitHub...")
             result = self.github.upload_backup(backup_path)
             if result:
+                self.manager.mark_uploaded(backup_path, result)
                 print("Backup uploaded to GitHub successfully")
             else:
                 print("GitHub upload failed")
@@ -287,30 +728,56 @@ class WARPScheduler:
             print("Uploading snapshot to GitHub...")
             result = self.github.upload_backup(backup_path)
             if result:
+                self.manager.mark_uploaded(backup_path, result)
                 print("Snapshot uploaded to GitHub successfully")
     
     def start_scheduler(self):
-        """Start the scheduler thread"""
+        """Run the scheduler until stopped (blocks the calling thread)"""
         if self.running:
             return
         
+        if not self.jobs:
+            self.schedule_daily_backup()
+        
         self.running = True
-        self.thread = threading.Thread(target=self._scheduler_loop, daemon=True)
-        self.thread.start()
         print("Scheduler started")
+        try:
+            asyncio.run(self._scheduler_loop())
+        finally:
+            self.running = False
+            self._loop = None
     
     def stop_scheduler(self):
         """Stop the scheduler"""
         self.running = False
-        if self.thread:
-            self.thread.join()
+        # After asyncio.run returns (e.g. on Ctrl-C) the loop is gone and there is nothing to cancel
+        loop = self._loop
+        if loop and not loop.is_closed():
+            for task in self._tasks:
+                loop.call_soon_threadsafe(task.cancel)
         print("Scheduler stopped")
     
-    def _scheduler_loop(self):
-        """Main scheduler loop"""
+    async def _run_job(self, weekday: Optional[int], time_str: str, job):
+        """Sleep until each run time, then execute the job off the event loop"""
+        loop = asyncio.get_running_loop()
         while self.running:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+            run_at = self._next_run(weekday, time_str, datetime.now())
+            # Wake at least hourly so suspend/resume and DST shifts are re-evaluated
+            while (delay := (run_at - datetime.now()).total_seconds()) > 0:
+                await asyncio.sleep(min(delay, 3600))
+            await loop.run_in_executor(None, job)
+    
+    async def _scheduler_loop(self):
+        """Main scheduler loop"""
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [asyncio.create_task(self._run_job(*job)) for job in self.jobs]
+        try:
+            await asyncio.gather(*self._tasks)
+        except asyncio.CancelledError:
+            # stop_scheduler clears running before cancelling; any other cancellation
+            # (asyncio.run on Ctrl-C) must propagate so it surfaces as KeyboardInterrupt
+            if self.running:
+                raise
 
 class WARPManagerEnhanced:
     """Enhanced WARP Manager with GitHub sync and scheduling"""
@@ -319,41 +786,25 @@ class WARPManagerEnhanced:
         self.home = Path.home()
         self.backup_dir = self.home / ".warp-backups"
         self.backup_dir.mkdir(exist_ok=True)
-        self.paths = self._get_warp_paths()
+        self.paths = get_warp_paths(sys.platform, self.home)
+        self._existing_paths_cache = (0.0, {})
         self.current_version = "1.2.0"  # Enhanced version
+        self.hash_cache_path = self.backup_dir / ".hashcache.sqlite"
+        # Trained dictionaries, one file per dict id, never overwritten; "current" names the active one
+        self.dict_dir = self.backup_dir / "dicts"
+        self.legacy_dict_path = self.backup_dir / ".zstd.dict"
+        self.index_path = self.backup_dir / "index.sqlite"
+        self.chunks = ChunkStore(self.backup_dir / "objects")
         self.github = GitHubSync()
         self.scheduler = WARPScheduler(self)
     
-    def _get_warp_paths(self) -> Dict[str, Path]:
-        """Get WARP paths for current OS"""
-        home = self.home
-        
-        if sys.platform == "linux":
-            return {
-                "config": home / ".config" / "warp-terminal",
-                "state": home / ".local" / "state" / "warp-terminal", 
-                "cache": home / ".cache" / "warp-terminal",
-                "profiles": home / ".warp_profiles",
-                "cloudflare": home / ".local" / "share" / "cloudflare-warp-gui"
-            }
-        elif sys.platform == "darwin":
-            return {
-                "config": home / "Library" / "Application Support" / "warp-terminal",
-                "state": home / "Library" / "Application Support" / "warp-terminal" / "state",
-                "cache": home / "Library" / "Caches" / "warp-terminal",
-                "profiles": home / ".warp_profiles"
-            }
-        elif sys.platform.startswith("win"):
-            appdata = Path(os.getenv("APPDATA", home / "AppData" / "Roaming"))
-            localappdata = Path(os.getenv("LOCALAPPDATA", home / "AppData" / "Local"))
-            return {
-                "config": appdata / "warp-terminal",
-                "state": localappdata / "warp-terminal",
-                "cache": localappdata / "warp-terminal" / "cache",
-                "profiles": home / ".warp_profiles"
-            }
-        else:
-            return {}
+    def get_existing_paths(self) -> Dict[str, Path]:
+        """Return only paths that exist, rechecked at most once a minute"""
+        checked_at, existing = self._existing_paths_cache
+        if time.monotonic() - checked_at >= 60:
+            existing = {k: v for k, v in self.paths.items() if v.exists()}
+            self._existing_paths_cache = (time.monotonic(), existing)
+        return existing
     
     def backup_with_sync(self, types: List[str], upload_to_github: bool = False) -> Optional[Path]:
         """Create backup and optionally sync to GitHub"""
@@ -363,6 +814,7 @@ class WARPManagerEnhanced:
             print("Uploading to GitHub...")
             result = self.github.upload_backup(backup_path)
             if result:
+                self.mark_uploaded(backup_path, result)
                 print("✅ Backup uploaded to GitHub successfully")
                 return backup_path
             else:
@@ -379,74 +831,46 @@ class WARPManagerEnhanced:
         
         print(f"Creating backup: {backup_name}")
         
-        files_to_backup = []
-        file_hashes = {}
-        
-        existing_paths = {k: v for k, v in self.paths.items() if v.exists()}
-        
-        # Collect files based on types (same logic as base class)
-        for backup_type in types:
-            if backup_type == "rules":
-                config_path = existing_paths.get("config")
-                if config_path:
-                    for rule_file in config_path.glob("*.md"):
-                        if "rule" in rule_file.name.lower() or "warp" in rule_file.name.lower():
-                            files_to_backup.append(rule_file)
-                            
-            elif backup_type == "mcp":
-                state_path = existing_paths.get("state")
-                if state_path:
-                    mcp_path = state_path / "mcp"
-                    if mcp_path.exists():
-                        for mcp_file in mcp_path.rglob("*"):
-                            if mcp_file.is_file():
-                                files_to_backup.append(mcp_file)
-                                
-            elif backup_type == "database":
-                state_path = existing_paths.get("state")
-                if state_path:
-                    for db_file in state_path.glob("*.sqlite*"):
-                        files_to_backup.append(db_file)
-                        
-            elif backup_type == "preferences":
-                config_path = existing_paths.get("config")
-                if config_path:
-                    for pref_file in config_path.glob("*.json"):
-                        files_to_backup.append(pref_file)
-                        
-            elif backup_type == "logs":
-                state_path = existing_paths.get("state")
-                if state_path:
-                    for log_file in state_path.glob("*.log*"):
-                        files_to_backup.append(log_file)
-                        
-            elif backup_type == "profiles":
-                profiles_path = existing_paths.get("profiles")
-                if profiles_path and profiles_path.exists():
-                    for profile_file in profiles_path.rglob("*"):
-                        if profile_file.is_file():
-                            files_to_backup.append(profile_file)
-        
-        files_to_backup = list(set(files_to_backup))
+        files_to_backup, file_stats, databases = self._collect_files(types)
         
         if not files_to_backup:
             print("No files found to backup")
             return None
         
-        # Calculate hashes
-        for file_path in files_to_backup:
-            file_hashes[str(file_path)] = self.calculate_file_hash(file_path)
+        # Snapshot live SQLite databases so WAL contents are captured consistently
+        snapshot_dir = Path(tempfile.mkdtemp(prefix=".snapshot-", dir=self.backup_dir)) if databases else None
+        snapshots = self._snapshot_databases(databases, files_to_backup, snapshot_dir)
+        
+        # Calculate hashes, skipping files unchanged since the last backup
+        file_hashes = self.calculate_file_hashes(
+            [p for p in files_to_backup if p not in snapshots], file_stats
+        )
+        for db_file, snapshot in snapshots.items():
+            file_hashes[str(db_file)] = self.calculate_file_hash(snapshot)
         
-        # Create archive
+        # Text members first, then binary, so each class gets its own zstd frame
+        ordered = sorted(files_to_backup, key=lambda p: not self._is_text(p))
+        
+        # Create archive: one tar stream split across a text frame and a binary frame
         try:
+            # The dictionary only pays off on a non-empty text frame; archives reference it by id
+            dict_data = self._load_dict() if self._is_text(ordered[0]) else None
             with open(backup_path, 'wb') as f:
-                cctx = zstd.ZstdCompressor(level=3, threads=-1)
-                with cctx.stream_writer(f) as compressor:
-                    with tarfile.open(fileobj=compressor, mode='w|') as tar:
-                        for file_path in files_to_backup:
+                with ZstdFrameWriter(f, self._get_compressor(text=True, dict_data=dict_data)) as compressor, \
+                        io.BufferedWriter(compressor, buffer_size=1 << 20) as buffered:
+                    # 'w' (not 'w|') writes members straight through, so flushing the 1 MiB
+                    # buffer at the text/binary boundary leaves nothing behind in tar
+                    with tarfile.open(fileobj=buffered, mode='w', copybufsize=1 << 20) as tar:
+                        hardlinks = {}
+                        in_text_frame = True
+                        for file_path in ordered:
+                            if in_text_frame and not self._is_text(file_path):
+                                buffered.flush()
+                                compressor.switch(self._get_compressor(text=False))
+                                in_text_frame = False
                             try:
                                 arcname = str(file_path.relative_to(self.home))
-                                tar.add(str(file_path), arcname=arcname)
+                                self._add_to_tar(tar, file_path, arcname, hardlinks, snapshots.get(file_path))
                             except Exception as e:
                                 print(f"Error adding {file_path}: {e}")
                                 continue
@@ -465,20 +889,19 @@ class WARPManagerEnhanced:
                             machine=os.getenv("HOSTNAME", "unknown")
                         )
                         
-                        manifest_json = json.dumps(asdict(manifest), indent=2)
-                        
-                        import tempfile
-                        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as temp_manifest:
-                            temp_manifest.write(manifest_json)
-                            temp_manifest.flush()
-                            tar.add(temp_manifest.name, arcname="manifest.json")
-                        os.unlink(temp_manifest.name)
+                        manifest_bytes = json.dumps(asdict(manifest), indent=2).encode('utf-8')
+                        manifest_info = tarfile.TarInfo("manifest.json")
+                        manifest_info.size = len(manifest_bytes)
+                        manifest_info.mtime = int(time.time())
+                        tar.addfile(manifest_info, io.BytesIO(manifest_bytes))
             
             # Save external manifest
             manifest_path = backup_path.with_suffix('.manifest.json')
             with open(manifest_path, 'w') as f:
                 json.dump(asdict(manifest), f, indent=2)
             
+            self._record_backup(backup_path)
+            
             print(f"✅ Backup created: {backup_path}")
             print(f"📁 Files backed up: {len(files_to_backup)}")
             return backup_path
@@ -488,48 +911,628 @@ class WARPManagerEnhanced:
             if backup_path.exists():
                 backup_path.unlink()
             return None
+        finally:
+            if snapshot_dir:
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+    
+    def backup_incremental(self, types: List[str], upload_to_github: bool = False) -> Optional[Path]:
+        """Chunk changed files into the object store and write a manifest referencing them"""
+        timestamp = datetime.now().strftime("%Y-%m-%dT%H%M%SZ")
+        scope = "-".join(types) if types else "full"
+        manifest_path = self.backup_dir / f"{timestamp}-{self.current_version}-default-{scope}.chunks.json"
+        
+        print(f"Creating incremental backup: {manifest_path.name}")
+        
+        files_to_backup, _, databases = self._collect_files(types)
+        
+        if not files_to_backup:
+            print("No files found to backup")
+            return None
+        
+        # Files whose mtime and size match the previous manifest keep its chunk list
+        previous = self.list_incremental_backups()
+        previous_files = {}
+        if previous:
+            try:
+                previous_files = json.loads(previous[-1].read_text())["files"]
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring unreadable manifest {previous[-1].name}: {e}")
+        
+        snapshot_dir = Path(tempfile.mkdtemp(prefix=".snapshot-", dir=self.backup_dir)) if databases else None
+        try:
+            snapshots = self._snapshot_databases(databases, files_to_backup, snapshot_dir)
+            
+            entries = {}
+            new_chunks = 0
+            for file_path in files_to_backup:
+                arcname = str(file_path.relative_to(self.home))
+                source = snapshots.get(file_path, file_path)
+                try:
+                    st = os.lstat(file_path)
+                    if stat.S_ISLNK(st.st_mode):
+                        entries[arcname] = {"chunks": [], "symlink": os.readlink(file_path), "mtime": st.st_mtime_ns}
+                        continue
+                    
+                    mode = stat.S_IMODE(st.st_mode)
+                    prior = previous_files.get(arcname)
+                    if (file_path not in snapshots and prior
+                            and prior.get("mtime") == st.st_mtime_ns and prior.get("size") == st.st_size
+                            and prior.get("mode") == mode
+                            and all(self.chunks.has(sha) for sha in prior["chunks"])):
+                        entries[arcname] = prior
+                        continue
+                    
+                    shas = []
+                    for data in iter_chunks(source):
+                        sha, created = self.chunks.put(data)
+                        new_chunks += created
+                        shas.append(sha)
+                    entries[arcname] = {"chunks": shas, "mtime": st.st_mtime_ns, "size": st.st_size, "mode": mode}
+                except Exception as e:
+                    print(f"Error chunking {file_path}: {e}")
+        finally:
+            if snapshot_dir:
+                shutil.rmtree(snapshot_dir, ignore_errors=True)
+        
+        manifest = {
+            "timestamp": datetime.now().isoformat(),
+            "semver": self.current_version,
+            "os_type": sys.platform,
+            "content_types": types,
+            "files": entries,
+        }
+        tmp_path = manifest_path.with_name(f".{manifest_path.name}.tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, manifest_path)
+        self._record_chunks({sha for entry in entries.values() for sha in entry["chunks"]})
+        
+        print(f"✅ Incremental backup created: {manifest_path}")
+        print(f"📁 Files backed up: {len(entries)} ({new_chunks} new chunks)")
+        
+        if upload_to_github and self.github.test_connection():
+            print("Uploading to GitHub...")
+            if self.upload_incremental(manifest_path):
+                print("✅ Incremental backup uploaded to GitHub successfully")
+            else:
+                print("❌ GitHub upload failed")
+        
+        return manifest_path
+    
+    def upload_incremental(self, manifest_path: Path) -> bool:
+        """Push chunks not yet on GitHub plus the manifest in a single commit"""
+        conn = self._open_index()
+        with conn:
+            pending = [row[0] for row in conn.execute("SELECT sha FROM chunks WHERE github_sha IS NULL")]
+        conn.close()
+        
+        files = {f"objects/{sha}.zst": self.chunks.path_for(sha) for sha in pending}
+        files[f"incremental/{manifest_path.name}"] = manifest_path
+        result = self.github.upload_files(files, f"Incremental backup: {manifest_path.name}")
+        if not result:
+            return False
+        
+        try:
+            conn = self._open_index()
+            with conn:
+                conn.executemany(
+                    "UPDATE chunks SET github_sha = ? WHERE sha = ?",
+                    [(result["commit"]["sha"], sha) for sha in pending]
+                )
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Backup index update failed: {e}")
+        return True
+    
+    def restore_incremental(self, manifest_path: Path) -> bool:
+        """Reassemble every file in an incremental manifest from the chunk store"""
+        try:
+            entries = json.loads(manifest_path.read_text())["files"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Cannot read manifest {manifest_path}: {e}")
+            return False
+        
+        print("Taking pre-restore snapshot...")
+        self.backup_incremental(["rules", "mcp", "database", "preferences", "logs", "profiles"])
+        
+        restored = 0
+        for arcname, entry in entries.items():
+            target = self.home / arcname
+            tmp_path = target.with_name(f".{target.name}.restore")
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path.unlink(missing_ok=True)
+                if "symlink" in entry:
+                    os.symlink(entry["symlink"], tmp_path)
+                    if os.utime in os.supports_follow_symlinks:
+                        os.utime(tmp_path, ns=(entry["mtime"], entry["mtime"]), follow_symlinks=False)
+                else:
+                    with open(tmp_path, 'wb') as f:
+                        for sha in entry["chunks"]:
+                            f.write(self.chunks.get(sha))
+                    # Manifests written before modes were recorded restore with the umask default
+                    if "mode" in entry:
+                        os.chmod(tmp_path, entry["mode"])
+                    os.utime(tmp_path, ns=(entry["mtime"], entry["mtime"]))
+                os.replace(tmp_path, target)
+                # A restored database must not pick up the live WAL of the old one
+                if target.name.endswith(".sqlite"):
+                    for sidecar in SQLITE_SIDECAR_SUFFIXES:
+                        target.with_name(target.name + sidecar).unlink(missing_ok=True)
+                restored += 1
+            except Exception as e:
+                print(f"Error restoring {arcname}: {e}")
+                tmp_path.unlink(missing_ok=True)
+        
+        print(f"✅ Restored {restored}/{len(entries)} files from {manifest_path.name}")
+        return restored == len(entries)
+    
+    def list_incremental_backups(self) -> List[Path]:
+        """List incremental backup manifests, oldest first"""
+        with os.scandir(self.backup_dir) as it:
+            return sorted(
+                self.backup_dir / entry.name for entry in it
+                if entry.name.endswith('.chunks.json')
+            )
+    
+    def _collect_files(self, types: List[str]):
+        """Collect files for the given backup types: (files, walk stat results, SQLite databases)"""
+        # Insertion-ordered dict used as an ordered set: dedupes as files are found
+        files_to_backup: Dict[Path, None] = {}
+        # stat results (symlinks followed) gathered while walking, reused by the hash cache
+        # and to hash each inode once; every path is still archived
+        file_stats = {}
+        databases = []
+        
+        def add(file_path: Path, entry: Optional[os.DirEntry] = None) -> bool:
+            if file_path in files_to_backup:
+                return False
+            try:
+                file_stats[str(file_path)] = entry.stat() if entry else file_path.stat()
+            except OSError as e:
+                # A dangling symlink is still archived as a link; there is just nothing to hash
+                if not file_path.is_symlink():
+                    print(f"Skipping {file_path}: {e}")
+                    return False
+            files_to_backup[file_path] = None
+            return True
+        
+        existing_paths = self.get_existing_paths()
+        
+        for backup_type in types:
+            if backup_type == "rules":
+                config_path = existing_paths.get("config")
+                if config_path:
+                    for rule_file in config_path.glob("*.md"):
+                        if "rule" in rule_file.name.lower() or "warp" in rule_file.name.lower():
+                            add(rule_file)
+                            
+            elif backup_type == "mcp":
+                state_path = existing_paths.get("state")
+                if state_path:
+                    mcp_path = state_path / "mcp"
+                    if mcp_path.exists():
+                        for entry in self._walk_files(mcp_path):
+                            add(Path(entry.path), entry)
+                                
+            elif backup_type == "database":
+                state_path = existing_paths.get("state")
+                if state_path:
+                    for db_file in state_path.glob("*.sqlite*"):
+                        if db_file.name.endswith(SQLITE_SIDECAR_SUFFIXES):
+                            continue
+                        if add(db_file):
+                            databases.append(db_file)
+                        
+            elif backup_type == "preferences":
+                config_path = existing_paths.get("config")
+                if config_path:
+                    for pref_file in config_path.glob("*.json"):
+                        add(pref_file)
+                        
+            elif backup_type == "logs":
+                state_path = existing_paths.get("state")
+                if state_path:
+                    for log_file in state_path.glob("*.log*"):
+                        add(log_file)
+                        
+            elif backup_type == "profiles":
+                profiles_path = existing_paths.get("profiles")
+                if profiles_path and profiles_path.exists():
+                    for entry in self._walk_files(profiles_path):
+                        add(Path(entry.path), entry)
+        
+        return files_to_backup, file_stats, databases
+    
+    def _snapshot_databases(self, databases: List[Path], files_to_backup: Dict[Path, None],
+                            snapshot_dir: Optional[Path]) -> Dict[Path, Path]:
+        """Snapshot each database into snapshot_dir; fall back to raw side files on failure"""
+        snapshots = {}
+        for db_file in databases:
+            snapshot = snapshot_dir / db_file.name
+            if self._snapshot_database(db_file, snapshot):
+                snapshots[db_file] = snapshot
+            else:
+                for sidecar in SQLITE_SIDECAR_SUFFIXES:
+                    sidecar_path = db_file.with_name(db_file.name + sidecar)
+                    if sidecar_path.exists():
+                        files_to_backup[sidecar_path] = None
+        return snapshots
+    
+    @staticmethod
+    def _snapshot_database(db_path: Path, dest: Path) -> bool:
+        """Write a consistent, compacted copy of a live SQLite database with its WAL folded in"""
+        try:
+            src = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+            try:
+                src.execute("VACUUM INTO ?", (str(dest),))
+            finally:
+                src.close()
+            return True
+        except sqlite3.Error as e:
+            print(f"Snapshot of {db_path} failed, archiving raw files: {e}")
+            return False
+    
+    @staticmethod
+    def _add_to_tar(tar: tarfile.TarFile, file_path: Path, arcname: str, hardlinks: Dict[tuple, str],
+                    source: Optional[Path] = None):
+        """Add a regular file from one lstat + open, skipping tarfile's own stat and user lookups.
+        Further paths of an inode already in the archive (hardlinks) become LNKTYPE members.
+        With source (a database snapshot), data and size come from it, metadata from file_path."""
+        st = os.lstat(file_path)
+        if not stat.S_ISREG(st.st_mode):
+            # Symlinks (dangling ones included) and special files keep tarfile's handling
+            tar.add(str(file_path), arcname=arcname, recursive=False)
+            return
+        
+        info = tarfile.TarInfo(name=arcname)
+        info.mtime = st.st_mtime
+        info.mode = stat.S_IMODE(st.st_mode)
+        info.uid = st.st_uid
+        info.gid = st.st_gid
+        
+        key = (st.st_dev, st.st_ino)
+        if st.st_nlink > 1 and key in hardlinks:
+            info.type = tarfile.LNKTYPE
+            info.linkname = hardlinks[key]
+            tar.addfile(info)
+            return
+        
+        # Unbuffered: the zstd stream writer already buffers on block boundaries
+        with open(source or file_path, 'rb', buffering=0) as fileobj:
+            info.size = os.fstat(fileobj.fileno()).st_size if source else st.st_size
+            tar.addfile(info, fileobj)
+        if st.st_nlink > 1:
+            hardlinks[key] = arcname
+    
+    @staticmethod
+    def _walk_files(root: Path):
+        """Yield DirEntry objects for all files and symlinks under root, reusing cached entry types"""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file() or entry.is_symlink():
+                            # Links (even dangling or to directories) are archived as links
+                            yield entry
+            except OSError as e:
+                print(f"Error scanning {directory}: {e}")
+    
+    def _open_hash_cache(self) -> sqlite3.Connection:
+        """Open the (path, mtime, size) -> sha256 cache"""
+        conn = sqlite3.connect(self.hash_cache_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, sha TEXT)"
+        )
+        return conn
+    
+    def calculate_file_hashes(self, files: List[Path], stats: Optional[Dict[str, os.stat_result]] = None) -> Dict[str, str]:
+        """Hash files, reusing cached digests for files whose mtime and size are unchanged"""
+        stats = stats or {}
+        file_hashes = {}
+        stale = []
+        
+        try:
+            conn = self._open_hash_cache()
+        except sqlite3.Error as e:
+            print(f"Hash cache unavailable: {e}")
+            conn = None
+        
+        for file_path in files:
+            try:
+                st = stats.get(str(file_path)) or file_path.stat()
+            except OSError:
+                if not file_path.is_symlink():
+                    stale.append((file_path, None))
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                # Links to directories are archived as links and carry no content hash
+                continue
+            row = None
+            if conn:
+                row = conn.execute(
+                    "SELECT sha FROM hashes WHERE path = ? AND mtime = ? AND size = ?",
+                    (str(file_path), st.st_mtime_ns, st.st_size)
+                ).fetchone()
+            if row:
+                file_hashes[str(file_path)] = row[0]
+            else:
+                stale.append((file_path, st))
+        
+        # Hash each inode once: hard links and symlinks to the same file share a digest
+        to_hash: Dict[tuple, Path] = {}
+        for file_path, st in stale:
+            to_hash.setdefault((st.st_dev, st.st_ino) if st else str(file_path), file_path)
+        
+        # Hash misses in parallel (hashlib releases the GIL on large buffers)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            inode_digests = dict(zip(to_hash, executor.map(self.calculate_file_hash, to_hash.values())))
+        
+        updates = []
+        for file_path, st in stale:
+            digest = inode_digests[(st.st_dev, st.st_ino) if st else str(file_path)]
+            file_hashes[str(file_path)] = digest
+            if st and digest:
+                updates.append((str(file_path), st.st_mtime_ns, st.st_size, digest))
+        
+        if conn:
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO hashes (path, mtime, size, sha) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, "
+                        "size = excluded.size, sha = excluded.sha",
+                        updates
+                    )
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                print(f"Hash cache update failed: {e}")
+            finally:
+                conn.close()
+        
+        return file_hashes
     
     def calculate_file_hash(self, filepath: Path) -> str:
         """Calculate SHA256 hash"""
-        hash_sha256 = hashlib.sha256()
         try:
             with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
+                if hasattr(hashlib, "file_digest"):
+                    return hashlib.file_digest(f, "sha256").hexdigest()
+                # Python < 3.11: hand OpenSSL the whole file as one buffer
+                if os.fstat(f.fileno()).st_size == 0:
+                    return hashlib.sha256().hexdigest()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return hashlib.sha256(mm).hexdigest()
         except Exception as e:
             print(f"Error hashing {filepath}: {e}")
             return ""
     
+    def _load_dict(self) -> Optional[zstd.ZstdCompressionDict]:
+        """Load the active trained zstd dictionary, if one exists"""
+        self._migrate_legacy_dict()
+        try:
+            dict_id = (self.dict_dir / "current").read_text().strip()
+            return zstd.ZstdCompressionDict((self.dict_dir / f"{dict_id}.zdict").read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable zstd dictionary: {e}")
+            return None
+    
+    def _store_dict(self, dict_data: zstd.ZstdCompressionDict) -> Path:
+        """Keep a dictionary under its dict id and make it the active one"""
+        self.dict_dir.mkdir(exist_ok=True)
+        dict_id = dict_data.dict_id()
+        dict_path = self.dict_dir / f"{dict_id}.zdict"
+        # Archives reference dictionaries by id, so an existing file is never replaced
+        if not dict_path.exists():
+            tmp_path = dict_path.with_name(f".{dict_path.name}.tmp")
+            tmp_path.write_bytes(dict_data.as_bytes())
+            os.replace(tmp_path, dict_path)
+        tmp_path = self.dict_dir / ".current.tmp"
+        tmp_path.write_text(str(dict_id))
+        os.replace(tmp_path, self.dict_dir / "current")
+        return dict_path
+    
+    def _migrate_legacy_dict(self):
+        """Move a pre-dicts/ .zstd.dict into the id-keyed store"""
+        if not self.legacy_dict_path.exists():
+            return
+        try:
+            self._store_dict(zstd.ZstdCompressionDict(self.legacy_dict_path.read_bytes()))
+            self.legacy_dict_path.unlink()
+        except Exception as e:
+            print(f"Could not migrate {self.legacy_dict_path}: {e}")
+    
+    def _get_compressor(self, text: bool, dict_data: Optional[zstd.ZstdCompressionDict] = None) -> zstd.ZstdCompressor:
+        """Build the compressor for text members (level 9, with the given trained dictionary)
+        or binary members (level 3 with long-range matching)"""
+        if text:
+            # write_dict_id: restore looks the dictionary up by the id in the frame header
+            params = zstd.ZstdCompressionParameters.from_level(9, threads=-1, write_dict_id=True)
+            if dict_data:
+                return zstd.ZstdCompressor(dict_data=dict_data, compression_params=params)
+            return zstd.ZstdCompressor(compression_params=params)
+        
+        params = zstd.ZstdCompressionParameters.from_level(
+            3, threads=-1, enable_ldm=True, window_log=27
+        )
+        return zstd.ZstdCompressor(compression_params=params)
+    
+    @staticmethod
+    def _is_text(file_path: Path) -> bool:
+        """Whether a backup member is a text file (rules, prefs, logs)"""
+        return file_path.suffix in TEXT_SUFFIXES or ".log" in file_path.name
+    
+    def train_dict(self, max_backups: int = 5, dict_size: int = 131072) -> bool:
+        """Train a zstd dictionary from members of the most recent backups"""
+        samples = []
+        total = 0
+        for backup_path in reversed(self.list_backups()[-max_backups:]):
+            try:
+                with open(backup_path, 'rb') as f:
+                    dctx = zstd.ZstdDecompressor(dict_data=read_archive_dict(f, self.dict_dir))
+                    with dctx.stream_reader(f, read_across_frames=True) as decompressor:
+                        with tarfile.open(fileobj=decompressor, mode='r|') as tar:
+                            for member in tar:
+                                # Small members are where a dictionary pays off
+                                if not member.isfile() or member.size > dict_size:
+                                    continue
+                                data = tar.extractfile(member).read()
+                                samples.append(data)
+                                total += len(data)
+            except Exception as e:
+                print(f"Skipping {backup_path.name}: {e}")
+            if total > 100 * dict_size:
+                break
+        
+        if not samples:
+            print("No backup members available for dictionary training")
+            return False
+        
+        try:
+            trained = zstd.train_dictionary(dict_size, samples)
+        except zstd.ZstdError as e:
+            print(f"Dictionary training failed: {e}")
+            return False
+        
+        dict_path = self._store_dict(trained)
+        print(f"✅ Trained zstd dictionary from {len(samples)} samples: {dict_path}")
+        return True
+    
     def take_snapshot(self) -> Optional[Path]:
         """Take complete snapshot"""
         return self.backup_selective(["rules", "mcp", "database", "preferences", "logs", "profiles"])
     
     def sync_all_to_github(self) -> int:
-        """Sync all local backups to GitHub"""
+        """Sync all local backups not yet on GitHub"""
         if not self.github.test_connection():
             print("❌ GitHub not configured or unreachable")
             return 0
         
-        backups = self.list_backups()
+        self.list_backups()  # reconcile the index with the directory
+        conn = self._open_index()
+        with conn:
+            names = [row[0] for row in conn.execute(
+                "SELECT name FROM backups WHERE github_sha IS NULL ORDER BY ts"
+            )]
+        conn.close()
+        backups = [self.backup_dir / name for name in names]
         uploaded = 0
         
-        for backup_path in backups:
-            print(f"Uploading {backup_path.name}...")
-            result = self.github.upload_backup(backup_path)
-            if result:
-                uploaded += 1
-                print(f"✅ Uploaded {backup_path.name}")
-            else:
-                print(f"❌ Failed to upload {backup_path.name}")
+        # Uploads are network-bound; overlap them over the shared session
+        with ThreadPoolExecutor(max_workers=UPLOAD_CONCURRENCY) as executor:
+            results = executor.map(self.github.upload_backup, backups)
+            for backup_path, result in zip(backups, results):
+                if result:
+                    uploaded += 1
+                    self.mark_uploaded(backup_path, result)
+                    print(f"✅ Uploaded {backup_path.name}")
+                else:
+                    print(f"❌ Failed to upload {backup_path.name}")
         
         return uploaded
     
+    def _open_index(self) -> sqlite3.Connection:
+        """Open the local backup index"""
+        conn = sqlite3.connect(self.index_path)
+        conn.execute("PRAGMA page_size=4096")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS backups ("
+            "name TEXT PRIMARY KEY, ts INTEGER NOT NULL, size INTEGER, github_sha TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_backups_ts ON backups(ts)")
+        # Chunk catalog for incremental backups; the sha primary key is the covering index
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (sha TEXT PRIMARY KEY, github_sha TEXT) WITHOUT ROWID"
+        )
+        return conn
+    
+    def _record_backup(self, backup_path: Path):
+        """Add a newly written backup to the index"""
+        st = backup_path.stat()
+        try:
+            conn = self._open_index()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO backups (name, ts, size, github_sha) VALUES (?, ?, ?, NULL)",
+                    (backup_path.name, st.st_mtime_ns, st.st_size)
+                )
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Backup index update failed: {e}")
+    
+    def _record_chunks(self, shas: Set[str]):
+        """Add chunks referenced by an incremental backup to the catalog"""
+        try:
+            conn = self._open_index()
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO chunks (sha, github_sha) VALUES (?, NULL)",
+                    [(sha,) for sha in shas]
+                )
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Backup index update failed: {e}")
+    
+    def mark_uploaded(self, backup_path: Path, result: Dict):
+        """Record the GitHub commit a backup was uploaded in"""
+        try:
+            conn = self._open_index()
+            with conn:
+                conn.execute(
+                    "UPDATE backups SET github_sha = ? WHERE name = ?",
+                    (result.get("commit", {}).get("sha"), backup_path.name)
+                )
+            conn.close()
+        except sqlite3.Error as e:
+            print(f"Backup index update failed: {e}")
+    
     def list_backups(self) -> List[Path]:
-        """List local backups"""
+        """List local backups, oldest first"""
         if not self.backup_dir.exists():
             return []
-        return sorted([f for f in self.backup_dir.iterdir() if f.suffix == '.zst'])
+        
+        # One scandir pass picks up backups written or removed outside this tool
+        with os.scandir(self.backup_dir) as it:
+            on_disk = {entry.name: entry for entry in it if entry.name.endswith('.zst')}
+        
+        try:
+            conn = self._open_index()
+            try:
+                with conn:
+                    indexed = {row[0] for row in conn.execute("SELECT name FROM backups")}
+                    conn.executemany(
+                        "DELETE FROM backups WHERE name = ?",
+                        [(name,) for name in indexed - on_disk.keys()]
+                    )
+                    new_rows = []
+                    for name in on_disk.keys() - indexed:
+                        try:
+                            st = on_disk[name].stat()
+                        except OSError:
+                            continue  # removed since the scan
+                        new_rows.append((name, st.st_mtime_ns, st.st_size))
+                    # Another process may index the same backup concurrently
+                    conn.executemany("INSERT OR IGNORE INTO backups (name, ts, size) VALUES (?, ?, ?)", new_rows)
+                    names = [row[0] for row in conn.execute("SELECT name FROM backups ORDER BY ts")]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Backup index unavailable: {e}")
+            return sorted(self.backup_dir / name for name in on_disk)
+        return [self.backup_dir / name for name in names]
 
 def main():
     """Enhanced main function with GitHub and scheduler options"""
@@ -540,13 +1543,16 @@ def main():
     parser.add_argument("--snapshot", action="store_true", help="Take snapshot")
     parser.add_argument("--backup", nargs="+", choices=["rules", "mcp", "database", "preferences", "logs", "profiles"], help="Selective backup")
     parser.add_argument("--upload", action="store_true", help="Upload backup to GitHub")
+    parser.add_argument("--incremental", action="store_true", help="Store --snapshot/--backup as deduplicated chunks")
+    parser.add_argument("--restore-incremental", metavar="MANIFEST", help="Restore from an incremental backup manifest")
     parser.add_argument("--sync-all", action="store_true", help="Sync all backups to GitHub")
     parser.add_argument("--setup-github", action="store_true", help="Setup GitHub integration")
     parser.add_argument("--schedule", choices=["daily", "weekly"], help="Setup scheduled backups")
     parser.add_argument("--schedule-time", default="02:00", help="Schedule time (HH:MM)")
-    parser.add_argument("--start-scheduler", action="store_true", help="Start scheduler daemon")
+    parser.add_argument("--start-scheduler", action="store_true", help="Start scheduler daemon (combine with --schedule; defaults to daily)")
     parser.add_argument("--list", action="store_true", help="List backups")
     parser.add_argument("--list-remote", action="store_true", help="List remote backups")
+    parser.add_argument("--train-dict", action="store_true", help="Train zstd dictionary from recent backups")
     
     args = parser.parse_args()
     
@@ -566,6 +1572,17 @@ def main():
             print("❌ Failed to create/access repository")
         return
     
+    if args.train_dict:
+        manager.train_dict()
+        return
+    
+    if args.restore_incremental:
+        manifest_path = Path(args.restore_incremental)
+        if not manifest_path.exists():
+            manifest_path = manager.backup_dir / args.restore_incremental
+        manager.restore_incremental(manifest_path)
+        return
+    
     if args.sync_all:
         uploaded = manager.sync_all_to_github()
         print(f"✅ Uploaded {uploaded} backups to GitHub")
@@ -587,30 +1604,29 @@ def main():
         elif args.schedule == "weekly":
             manager.scheduler.schedule_weekly_backup("sunday", args.schedule_time)
         print(f"✅ Scheduled {args.schedule} backups")
-        return
+        if not args.start_scheduler:
+            return
     
     if args.start_scheduler:
         print("🕐 Starting backup scheduler...")
-        manager.scheduler.start_scheduler()
         try:
-            while True:
-                time.sleep(60)
+            manager.scheduler.start_scheduler()
         except KeyboardInterrupt:
             manager.scheduler.stop_scheduler()
-            print("Scheduler stopped")
         return
     
     # Handle regular backup commands
     if args.cli or any([args.snapshot, args.backup, args.list]):
+        backup = manager.backup_incremental if args.incremental else manager.backup_with_sync
         if args.snapshot:
-            backup_path = manager.backup_with_sync(
+            backup_path = backup(
                 ["rules", "mcp", "database", "preferences", "logs", "profiles"],
                 args.upload
             )
             print(f"Snapshot: {backup_path}")
             
         elif args.backup:
-            backup_path = manager.backup_with_sync(args.backup, args.upload)
+            backup_path = backup(args.backup, args.upload)
             print(f"Backup: {backup_path}")
             
         elif args.list:
@@ -3,21 +3,29 @@
 WARP Data Manager - Backup, Restore & Manage WARP Terminal Data
 Fast, professional tool for managing all WARP configurations and data.
 """
+import io
 import os
+import errno
 import sys
 import json
 import shutil
+import socket
 import sqlite3
+import stat
 import tarfile
 import zstandard as zstd
 import hashlib
+import mmap
 import subprocess
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 import threading
+import functools
+import time
 import webbrowser
 from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
     import gi
@@ -33,6 +41,41 @@ try:
 except ImportError:
     KEYRING_AVAILABLE = False
 
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import libarchive
+    # zstd:threads needs libarchive 3.6, zstd:long 3.7
+    LIBARCHIVE_AVAILABLE = libarchive.ffi.version_number() >= 3006000
+    LIBARCHIVE_ZSTD_LONG = libarchive.ffi.version_number() >= 3007000
+except (ImportError, OSError):
+    # OSError: python-libarchive-c is installed but the libarchive shared library is not
+    LIBARCHIVE_AVAILABLE = False
+    LIBARCHIVE_ZSTD_LONG = False
+
+# Manifest hash algorithm: BLAKE3 when installed (SIMD + multithreaded), else SHA-256
+HASH_ALGO = "blake3" if BLAKE3_AVAILABLE else "sha256"
+
+# --compression tiers: fast keeps level 3 throughput, balanced gets most of the
+# ratio of max at a fraction of its CPU, max is zstd's slowest/smallest level
+COMPRESSION_LEVELS = {"fast": 3, "balanced": 15, "max": 22}
+
+# Hash cache entries not looked up for this many runs are dropped when the cache is saved
+HASH_CACHE_KEEP_RUNS = 5
+
+# Skippable zstd frame magic for the dictionary enhanced backups embed at the start of an archive
+DICT_FRAME_MAGIC = 0x184D2A5D
+
 @dataclass
 class BackupManifest:
     """Backup manifest structure"""
@@ -46,15 +89,63 @@ class BackupManifest:
     encrypted: bool
     user: str
     machine: str
+    algo: str = "sha256"
+
+def dump_manifest(manifest: BackupManifest, pretty: bool = False) -> bytes:
+    """Serialize a manifest: compact for the archive copy, indented for the sidecar file"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(manifest, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(asdict(manifest), indent=2).encode('utf-8')
+    return json.dumps(asdict(manifest), separators=(",", ":")).encode('utf-8')
+
+class HashPipeline:
+    """Background worker applying hash updates in submission order while the archive keeps streaming"""
+    
+    def __init__(self, max_pending: int = 16):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # Bounds queued chunks (1 MiB each) if hashing ever falls behind the writer
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+    
+    def submit(self, func, *args):
+        self.slots.acquire()
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(lambda _: self.slots.release())
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.executor.shutdown(wait=True)
+
+class HashingReader:
+    """Read-only file wrapper that feeds every byte read into the manifest hash,
+    on the pipeline's worker when one is given"""
+    
+    def __init__(self, fileobj, pipeline: Optional[HashPipeline] = None):
+        self.fileobj = fileobj
+        self.pipeline = pipeline
+        self.h = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.sha256()
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        if self.pipeline:
+            self.pipeline.submit(self.h.update, data)
+        else:
+            self.h.update(data)
+        return data
 
 class WARPPaths:
     """Cross-platform WARP path detection"""
     
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def get_home() -> Path:
         return Path.home()
     
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def get_warp_paths() -> Dict[str, Path]:
         """Get all WARP data paths for current OS"""
         home = WARPPaths.get_home()
@@ -94,40 +185,133 @@ class WARPManager:
         self.backup_dir = self.home / ".warp-backups"
         self.backup_dir.mkdir(exist_ok=True)
         self.paths = WARPPaths.get_warp_paths()
+        self._existing_paths_cache = (0.0, {})
+        self._user = os.getenv("USER", "unknown")
+        self._machine = os.getenv("HOSTNAME") or socket.gethostname()
         self.current_version = "1.1.1"
+        self.hash_cache_path = self.backup_dir / ".hash-cache.json"
+        self._hash_cache = None
+        self._hash_cache_run = 0
+        self._hash_cache_lock = threading.Lock()
         
     def get_existing_paths(self) -> Dict[str, Path]:
-        """Return only paths that actually exist"""
-        return {k: v for k, v in self.paths.items() if v.exists()}
+        """Return only paths that actually exist, rechecked at most once a minute"""
+        checked_at, existing = self._existing_paths_cache
+        if time.monotonic() - checked_at >= 60:
+            existing = {k: v for k, v in self.paths.items() if v.exists()}
+            self._existing_paths_cache = (time.monotonic(), existing)
+        return existing
+    
+    def _invalidate_existing_paths(self):
+        """Force the next get_existing_paths call to recheck the filesystem"""
+        self._existing_paths_cache = (0.0, {})
     
     def calculate_file_hash(self, filepath: Path) -> str:
-        """Calculate SHA256 hash of file"""
-        hash_sha256 = hashlib.sha256()
+        """Calculate the manifest hash of file, reusing the cached digest while it is unchanged"""
         try:
+            st = os.stat(filepath)
+        except OSError as e:
+            print(f"Error hashing {filepath}: {e}")
+            return ""
+        
+        digest = self._cached_hash(st)
+        if not digest:
+            digest = self._hash_file(filepath)
+            if digest:
+                self._store_hash(st, digest)
+        return digest
+    
+    def _hash_file(self, filepath: Path) -> str:
+        """Calculate the manifest hash (BLAKE3 or SHA256) of file"""
+        try:
+            if BLAKE3_AVAILABLE:
+                hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                hasher.update_mmap(str(filepath))
+                return hasher.hexdigest()
             with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
+                if os.fstat(f.fileno()).st_size > 1 << 20:
+                    # Large files: OpenSSL hashes the mapping in one call, no copies into Python
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        return hashlib.sha256(mm).hexdigest()
+                if hasattr(hashlib, "file_digest"):
+                    return hashlib.file_digest(f, "sha256").hexdigest()
+                return hashlib.sha256(f.read()).hexdigest()
         except Exception as e:
             print(f"Error hashing {filepath}: {e}")
             return ""
     
+    def _get_hash_cache(self) -> Dict[str, list]:
+        """Load the hash cache on first use: "dev:ino" -> [algo, mtime_ns, size, digest, last run]"""
+        with self._hash_cache_lock:
+            if self._hash_cache is None:
+                try:
+                    data = json.loads(self.hash_cache_path.read_text())
+                    self._hash_cache = data["files"]
+                    self._hash_cache_run = data["run"] + 1
+                except (OSError, ValueError, KeyError, TypeError):
+                    self._hash_cache = {}
+                    self._hash_cache_run = 1
+            return self._hash_cache
+    
+    def _cached_hash(self, st: os.stat_result) -> Optional[str]:
+        """Return the cached digest for a file whose mtime and size are unchanged"""
+        entry = self._get_hash_cache().get(f"{st.st_dev}:{st.st_ino}")
+        if entry and entry[:3] == [HASH_ALGO, st.st_mtime_ns, st.st_size]:
+            entry[4] = self._hash_cache_run
+            return entry[3]
+        return None
+    
+    def _store_hash(self, st: os.stat_result, digest: str):
+        cache = self._get_hash_cache()
+        with self._hash_cache_lock:
+            cache[f"{st.st_dev}:{st.st_ino}"] = [
+                HASH_ALGO, st.st_mtime_ns, st.st_size, digest, self._hash_cache_run
+            ]
+    
+    def _save_hash_cache(self):
+        """Atomically write the hash cache back, if it was used, dropping stale entries"""
+        if self._hash_cache is None:
+            return
+        with self._hash_cache_lock:
+            files = {
+                key: list(entry) for key, entry in self._hash_cache.items()
+                if self._hash_cache_run - entry[4] < HASH_CACHE_KEEP_RUNS
+            }
+        tmp_path = self.hash_cache_path.with_name(f"{self.hash_cache_path.name}.tmp")
+        try:
+            tmp_path.write_text(json.dumps({"run": self._hash_cache_run, "files": files}, separators=(",", ":")))
+            os.replace(tmp_path, self.hash_cache_path)
+        except OSError as e:
+            print(f"Could not save hash cache: {e}")
+    
+    def calculate_file_hashes_batch(self, paths: List[Path]) -> Dict[str, str]:
+        """Hash a batch of independent files, several at a time when the batch is big enough"""
+        if len(paths) < 4:
+            return {str(p): self.calculate_file_hash(p) for p in paths}
+        # OpenSSL hashes with the GIL released, so threads keep several lanes busy
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+            return {str(p): h for p, h in zip(paths, executor.map(self.calculate_file_hash, paths))}
+    
     def create_manifest(self, content_types: List[str], file_hashes: Dict[str, str], size: int) -> BackupManifest:
         """Create backup manifest"""
+        # One clock read so id and timestamp always agree
+        now = datetime.now()
         return BackupManifest(
-            id=datetime.now().strftime("%Y%m%d%H%M%S"),
-            timestamp=datetime.now().isoformat(),
+            id=now.strftime("%Y%m%d%H%M%S"),
+            timestamp=now.isoformat(),
             semver=self.current_version,
             os_type=sys.platform,
             content_types=content_types,
             file_hashes=file_hashes,
             size=size,
             encrypted=False,
-            user=os.getenv("USER", "unknown"),
-            machine=os.getenv("HOSTNAME", "unknown")
+            user=self._user,
+            machine=self._machine,
+            algo=HASH_ALGO
         )
     
-    def backup_selective(self, types: List[str]) -> Optional[Path]:
+    def backup_selective(self, types: List[str], compression_level: int = COMPRESSION_LEVELS["balanced"],
+                         writer: str = "tarfile") -> Optional[Path]:
         """Create selective backup of specific types"""
         timestamp = datetime.now().strftime("%Y-%m-%dT%H%M%SZ")
         scope = "-".join(types) if types else "full"
@@ -136,115 +320,260 @@ class WARPManager:
         
         print(f"Creating backup: {backup_name}")
         
-        # Collect files based on types
-        files_to_backup = []
-        file_hashes = {}
-        
-        existing_paths = self.get_existing_paths()
-        
-        for backup_type in types:
-            if backup_type == "rules":
-                config_path = existing_paths.get("config")
-                if config_path:
-                    for rule_file in config_path.glob("*.md"):
-                        if "rule" in rule_file.name.lower() or "warp" in rule_file.name.lower():
-                            files_to_backup.append(rule_file)
-                            
-            elif backup_type == "mcp":
-                state_path = existing_paths.get("state")
-                if state_path:
-                    mcp_path = state_path / "mcp"
-                    if mcp_path.exists():
-                        for mcp_file in mcp_path.rglob("*"):
-                            if mcp_file.is_file():
-                                files_to_backup.append(mcp_file)
-                                
-            elif backup_type == "database":
-                state_path = existing_paths.get("state")
-                if state_path:
-                    for db_file in state_path.glob("*.sqlite*"):
-                        files_to_backup.append(db_file)
-                        
-            elif backup_type == "preferences":
-                config_path = existing_paths.get("config")
-                if config_path:
-                    for pref_file in config_path.glob("*.json"):
-                        files_to_backup.append(pref_file)
-                        
-            elif backup_type == "logs":
-                state_path = existing_paths.get("state")
-                if state_path:
-                    for log_file in state_path.glob("*.log*"):
-                        files_to_backup.append(log_file)
-                        
-            elif backup_type == "profiles":
-                profiles_path = existing_paths.get("profiles")
-                if profiles_path and profiles_path.exists():
-                    for profile_file in profiles_path.rglob("*"):
-                        if profile_file.is_file():
-                            files_to_backup.append(profile_file)
-        
-        # Remove duplicates
-        files_to_backup = list(set(files_to_backup))
+        # Discovery yields each file once, in walk order; only the paths are held
+        files_to_backup = list(self._iter_backup_files(types, self.get_existing_paths()))
         
         if not files_to_backup:
             print("No files found to backup")
             return None
-            
-        # Calculate hashes
-        for file_path in files_to_backup:
-            file_hashes[str(file_path)] = self.calculate_file_hash(file_path)
         
         # Create compressed archive
         try:
-            with open(backup_path, 'wb') as f:
-                cctx = zstd.ZstdCompressor(level=3, threads=-1)
-                with cctx.stream_writer(f) as compressor:
-                    with tarfile.open(fileobj=compressor, mode='w|') as tar:
-                        for file_path in files_to_backup:
-                            try:
-                                # Use relative path from home
-                                arcname = str(file_path.relative_to(self.home))
-                                tar.add(str(file_path), arcname=arcname)
-                            except Exception as e:
-                                print(f"Error adding {file_path}: {e}")
-                                continue
-                        
-                        # Add manifest
-                        manifest = self.create_manifest(types, file_hashes, 0)
-                        manifest_json = json.dumps(asdict(manifest), indent=2)
-                        
-                        import tempfile
-                        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as temp_manifest:
-                            temp_manifest.write(manifest_json)
-                            temp_manifest.flush()
-                            tar.add(temp_manifest.name, arcname="manifest.json")
-                        os.unlink(temp_manifest.name)
+            # libarchive writes no zstd frame checksum, so it is opt-in rather than the default
+            if writer == "libarchive" and not LIBARCHIVE_AVAILABLE:
+                print("libarchive >= 3.6 with python-libarchive-c not available, using tarfile")
+                writer = "tarfile"
+            if writer == "libarchive":
+                manifest = self._write_libarchive(backup_path, files_to_backup, types, compression_level)
+            else:
+                manifest = self._write_tarfile(backup_path, files_to_backup, types, compression_level)
             
             # Save external manifest
             manifest_path = backup_path.with_suffix('.manifest.json')
-            with open(manifest_path, 'w') as f:
-                json.dump(asdict(manifest), f, indent=2)
-                
-            print(f"Backup created: {backup_path}")
-            print(f"Files backed up: {len(files_to_backup)}")
-            return backup_path
+            manifest_path.write_bytes(dump_manifest(manifest, pretty=True))
             
         except Exception as e:
             print(f"Backup failed: {e}")
             if backup_path.exists():
                 backup_path.unlink()
             return None
+        
+        # The archive is complete; a cache write problem only costs rehashing next time
+        self._save_hash_cache()
+        print(f"Backup created: {backup_path}")
+        print(f"Files backed up: {len(files_to_backup)}")
+        return backup_path
     
-    def take_snapshot(self) -> Optional[Path]:
+    def _write_tarfile(self, backup_path: Path, files_to_backup: List[Path], types: List[str],
+                       compression_level: int) -> BackupManifest:
+        """Write the archive with tarfile + python-zstandard and return its manifest"""
+        file_hashes = {}
+        window_log = self._window_log(files_to_backup)
+        
+        with open(backup_path, 'wb') as f:
+            params = zstd.ZstdCompressionParameters.from_level(
+                compression_level, threads=os.cpu_count(), enable_ldm=True,
+                window_log=window_log, write_checksum=True
+            )
+            cctx = zstd.ZstdCompressor(compression_params=params)
+            with cctx.stream_writer(f) as compressor:
+                # 1 MiB file reads and stream writes instead of tarfile's 16 KiB/10 KiB defaults
+                with tarfile.open(fileobj=compressor, mode='w|', bufsize=1 << 20, copybufsize=1 << 20) as tar:
+                    linked = []
+                    # Hashing overlaps with reading/compressing; leaving the block waits for it
+                    with HashPipeline() as pipeline:
+                        for file_path in files_to_backup:
+                            try:
+                                # Use relative path from home
+                                arcname = str(file_path.relative_to(self.home))
+                                if not self._add_to_tar(tar, file_path, arcname, file_hashes, pipeline):
+                                    linked.append(file_path)
+                            except Exception as e:
+                                print(f"Error adding {file_path}: {e}")
+                                continue
+                    file_hashes.update(self.calculate_file_hashes_batch(linked))
+                    
+                    # Add manifest
+                    manifest = self.create_manifest(types, file_hashes, 0)
+                    manifest_bytes = dump_manifest(manifest)
+                    manifest_info = tarfile.TarInfo("manifest.json")
+                    manifest_info.size = len(manifest_bytes)
+                    manifest_info.mtime = int(time.time())
+                    tar.addfile(manifest_info, io.BytesIO(manifest_bytes))
+        
+        return manifest
+    
+    def _window_log(self, files_to_backup: List[Path]) -> int:
+        """Size the long-range window to the input: up to 128 MiB, but no larger than needed"""
+        total_bytes = 0
+        for file_path in files_to_backup:
+            try:
+                total_bytes += file_path.stat().st_size
+            except OSError:
+                pass
+        return min(27, max(20, total_bytes.bit_length()))
+    
+    def _write_libarchive(self, backup_path: Path, files_to_backup: List[Path], types: List[str],
+                          compression_level: int) -> BackupManifest:
+        """Write the archive with libarchive's native tar+zstd writer and return its manifest"""
+        file_hashes = {}
+        options = f"zstd:compression-level={compression_level},zstd:threads={os.cpu_count()}"
+        if LIBARCHIVE_ZSTD_LONG:
+            options += f",zstd:long={self._window_log(files_to_backup)}"
+        
+        with libarchive.file_writer(str(backup_path), 'pax_restricted', 'zstd', options=options) as archive:
+            linked = []
+            with HashPipeline() as pipeline:
+                for file_path in files_to_backup:
+                    try:
+                        arcname = str(file_path.relative_to(self.home))
+                        # One lstat per file decides between a symlink entry and file data
+                        st = os.lstat(file_path)
+                        if stat.S_ISLNK(st.st_mode):
+                            archive.add_files(str(file_path), pathname=arcname, recursive=False)
+                            linked.append(file_path)
+                            continue
+                        with open(file_path, 'rb') as f:
+                            digest = self._cached_hash(st)
+                            reader = f if digest else HashingReader(f, pipeline)
+                            archive.add_file_from_memory(
+                                arcname, st.st_size, iter(functools.partial(reader.read, 1 << 20), b""),
+                                permission=stat.S_IMODE(st.st_mode), mtime=int(st.st_mtime)
+                            )
+                        if digest:
+                            with pipeline.lock:
+                                file_hashes[str(file_path)] = digest
+                        else:
+                            pipeline.submit(self._finish_hash, reader.h, st, str(file_path), file_hashes, pipeline.lock)
+                    except Exception as e:
+                        print(f"Error adding {file_path}: {e}")
+                        continue
+            file_hashes.update(self.calculate_file_hashes_batch(linked))
+            
+            manifest = self.create_manifest(types, file_hashes, 0)
+            manifest_bytes = dump_manifest(manifest)
+            archive.add_file_from_memory("manifest.json", len(manifest_bytes), manifest_bytes, mtime=int(time.time()))
+        
+        return manifest
+    
+    # backup type -> (WARP path key, collector); collectors yield the type's files under that root
+    _TYPE_HANDLERS = {
+        "rules": ("config", "_collect_rules"),
+        "mcp": ("state", "_collect_mcp"),
+        "database": ("state", "_collect_database"),
+        "preferences": ("config", "_collect_preferences"),
+        "logs": ("state", "_collect_logs"),
+        "profiles": ("profiles", "_collect_profiles"),
+    }
+    
+    def _iter_backup_files(self, types: List[str], existing_paths: Dict[str, Path]):
+        """Yield each file selected by the backup types once, in discovery order"""
+        # One-level listing per WARP directory, scanned once and shared by every type living there
+        listings: Dict[str, list] = {}
+        # Keyed by the path string: one str hash per file instead of Path hashing/equality
+        seen: Dict[str, Path] = {}
+        for backup_type in types:
+            root_key, collector = self._TYPE_HANDLERS[backup_type]
+            root = existing_paths.get(root_key)
+            if not root:
+                continue
+            
+            def list_root(root_key=root_key, root=root):
+                if root_key not in listings:
+                    listings[root_key] = list(self._scandir_files(root, recursive=False))
+                return listings[root_key]
+            
+            for file_path in getattr(self, collector)(root, list_root):
+                if seen.setdefault(os.fspath(file_path), file_path) is file_path:
+                    yield file_path
+    
+    @staticmethod
+    def _collect_rules(root: Path, list_root):
+        for entry in list_root():
+            name = entry.name.lower()
+            if entry.name.endswith(".md") and ("rule" in name or "warp" in name):
+                yield Path(entry.path)
+    
+    def _collect_mcp(self, root: Path, list_root):
+        mcp_path = root / "mcp"
+        if mcp_path.exists():
+            for entry in self._scandir_files(mcp_path):
+                yield Path(entry.path)
+    
+    @staticmethod
+    def _collect_database(root: Path, list_root):
+        for entry in list_root():
+            if ".sqlite" in entry.name:
+                yield Path(entry.path)
+    
+    @staticmethod
+    def _collect_preferences(root: Path, list_root):
+        for entry in list_root():
+            if entry.name.endswith(".json"):
+                yield Path(entry.path)
+    
+    @staticmethod
+    def _collect_logs(root: Path, list_root):
+        for entry in list_root():
+            if ".log" in entry.name:
+                yield Path(entry.path)
+    
+    def _collect_profiles(self, root: Path, list_root):
+        for entry in self._scandir_files(root):
+            yield Path(entry.path)
+    
+    @staticmethod
+    def _scandir_files(root: Path, recursive: bool = True):
+        """Yield DirEntry objects for files in root (and below), using scandir's cached entry types"""
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+            except OSError as e:
+                print(f"Error scanning {directory}: {e}")
+    
+    def _add_to_tar(self, tar: tarfile.TarFile, file_path: Path, arcname: str,
+                    file_hashes: Dict[str, str], pipeline: HashPipeline) -> bool:
+        """Add a file to the archive; its hash, computed from the bytes tar reads, lands in
+        file_hashes once the pipeline drains. Returns False for symlinks, whose targets the
+        caller hashes separately."""
+        info = tar.gettarinfo(str(file_path), arcname=arcname)
+        if not info.isreg():
+            tar.addfile(info)
+            return False
+        
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            digest = self._cached_hash(st)
+            if digest:
+                tar.addfile(info, f)
+                with pipeline.lock:
+                    file_hashes[str(file_path)] = digest
+                return True
+            reader = HashingReader(f, pipeline)
+            tar.addfile(info, reader)
+        pipeline.submit(self._finish_hash, reader.h, st, str(file_path), file_hashes, pipeline.lock)
+        return True
+    
+    def _finish_hash(self, h, st: os.stat_result, key: str, file_hashes: Dict[str, str], lock: threading.Lock):
+        """Pipeline step after a file's last chunk: record and cache its digest"""
+        digest = h.hexdigest()
+        self._store_hash(st, digest)
+        with lock:
+            file_hashes[key] = digest
+    
+    def take_snapshot(self, compression_level: int = COMPRESSION_LEVELS["balanced"],
+                      writer: str = "tarfile") -> Optional[Path]:
         """Take complete snapshot of all WARP data"""
-        return self.backup_selective(["rules", "mcp", "database", "preferences", "logs", "profiles"])
+        return self.backup_selective(
+            ["rules", "mcp", "database", "preferences", "logs", "profiles"], compression_level, writer
+        )
     
-    def list_backups(self) -> List[Path]:
-        """List all available backups"""
+    def list_backups(self) -> List[os.DirEntry]:
+        """List all available backups, oldest first; entries cache their stat() result"""
         if not self.backup_dir.exists():
             return []
-        return sorted([f for f in self.backup_dir.iterdir() if f.suffix == '.zst'])
+        with os.scandir(self.backup_dir) as it:
+            entries = [e for e in it if e.name.endswith('.zst')]
+        entries.sort(key=lambda e: e.name)
+        return entries
     
     def restore_backup(self, backup_path: Path, dry_run: bool = False) -> bool:
         """Restore from backup"""
@@ -256,8 +585,9 @@ class WARPManager:
             print(f"DRY RUN: Would restore from {backup_path}")
             return True
         
-        # Create pre-restore backup
+        # Create pre-restore backup; paths may have appeared since the cache was filled
         print("Creating pre-restore backup...")
+        self._invalidate_existing_paths()
         pre_restore = self.take_snapshot()
         if pre_restore:
             print(f"Pre-restore backup: {pre_restore}")
@@ -265,13 +595,24 @@ class WARPManager:
         try:
             print(f"Restoring from: {backup_path}")
             
-            # Extract archive
+            # Extract archive (with the dictionary it was compressed with, if any)
             with open(backup_path, 'rb') as f:
-                dctx = zstd.ZstdDecompressor()
-                with dctx.stream_reader(f) as decompressor:
+                dctx = zstd.ZstdDecompressor(dict_data=self._read_archive_dict(f))
+                # Enhanced backups span several zstd frames (text/binary)
+                with dctx.stream_reader(f, read_across_frames=True) as decompressor:
                     with tarfile.open(fileobj=decompressor, mode='r|') as tar:
-                        tar.extractall(path=self.home)
+                        restored = set()
+                        for member in tar:
+                            # A database snapshot must not be paired with the live copy's stale WAL
+                            if member.name.endswith(".sqlite"):
+                                for suffix in ("-wal", "-shm", "-journal"):
+                                    sidecar = self.home / f"{member.name}{suffix}"
+                                    if f"{member.name}{suffix}" not in restored and sidecar.exists():
+                                        sidecar.unlink()
+                            tar.extract(member, path=self.home)
+                            restored.add(member.name)
             
+            self._invalidate_existing_paths()
             print("Restore completed successfully")
             return True
             
@@ -279,8 +620,39 @@ class WARPManager:
             print(f"Restore failed: {e}")
             return False
     
+    def _read_archive_dict(self, f) -> Optional[zstd.ZstdCompressionDict]:
+        """Return the dictionary an archive was compressed with: the embedded copy, else the
+        stored dictionary matching the frame's dict id; leaves f at the start of the archive"""
+        try:
+            header = f.read(8)
+            if len(header) == 8 and int.from_bytes(header[:4], "little") == DICT_FRAME_MAGIC:
+                return zstd.ZstdCompressionDict(f.read(int.from_bytes(header[4:], "little")))
+            f.seek(0)
+            dict_id = zstd.get_frame_parameters(f.read(18)).dict_id
+        finally:
+            f.seek(0)
+        if not dict_id:
+            return None
+        
+        candidates = [self.backup_dir / "dicts" / f"{dict_id}.zdict", self.backup_dir / ".zstd.dict"]
+        for dict_path in candidates:
+            if dict_path.exists():
+                dict_data = zstd.ZstdCompressionDict(dict_path.read_bytes())
+                if dict_data.dict_id() == dict_id:
+                    return dict_data
+        raise FileNotFoundError(f"archive needs zstd dictionary {dict_id}, which is not available")
+    
     def reset_warp_data(self, safe_mode: bool = True) -> bool:
         """Reset WARP data (safe or destructive)"""
+        # Directory trees are independent, so they are moved/deleted in parallel.
+        # Skip paths nested in another one (macOS state lives under config).
+        self._invalidate_existing_paths()
+        existing = self.get_existing_paths()
+        targets = {
+            name: path for name, path in existing.items()
+            if not any(other in path.parents for other in existing.values())
+        }
+        
         if safe_mode:
             # Create backup first
             backup = self.take_snapshot()
@@ -291,23 +663,51 @@ class WARPManager:
             quarantine_dir = self.backup_dir / f"quarantine-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
             quarantine_dir.mkdir(exist_ok=True)
             
-            for name, path in self.get_existing_paths().items():
-                if path.exists():
-                    dest = quarantine_dir / name
+            # Same filesystem: a metadata-only rename; otherwise (EXDEV, bind mounts
+            # included) shutil.move copies the tree
+            def quarantine(name: str, path: Path):
+                dest = quarantine_dir / name
+                try:
+                    path.rename(dest)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    print(f"{path} is on another filesystem: copying to quarantine")
                     shutil.move(str(path), str(dest))
-                    print(f"Moved {path} to quarantine")
             
+            ok = self._run_on_paths(quarantine, targets, "Moved {path} to quarantine")
+            
+            self._invalidate_existing_paths()
             print(f"WARP data moved to quarantine: {quarantine_dir}")
-            return True
+            return ok
         else:
             # Destructive wipe
-            for name, path in self.get_existing_paths().items():
-                if path.exists():
-                    shutil.rmtree(str(path))
-                    print(f"Deleted: {path}")
+            ok = self._run_on_paths(
+                lambda name, path: shutil.rmtree(str(path)),
+                targets, "Deleted: {path}"
+            )
             
+            self._invalidate_existing_paths()
             print("WARP data destructively wiped")
+            return ok
+    
+    @staticmethod
+    def _run_on_paths(func, targets: Dict[str, Path], done_message: str) -> bool:
+        """Run func(name, path) for every target on a thread pool; report each result"""
+        if not targets:
             return True
+        ok = True
+        with ThreadPoolExecutor(max_workers=min(8, len(targets))) as executor:
+            futures = {executor.submit(func, name, path): path for name, path in targets.items()}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    future.result()
+                    print(done_message.format(path=path))
+                except Exception as e:
+                    print(f"Error processing {path}: {e}")
+                    ok = False
+        return ok
     
     def delete_local_database(self) -> bool:
         """Delete local WARP database"""
@@ -330,6 +730,7 @@ class WARPManager:
             except Exception as e:
                 print(f"Error deleting {db_file}: {e}")
         
+        self._invalidate_existing_paths()
         return len(db_files) > 0
 
 class WARPManagerGUI:
@@ -626,13 +1027,14 @@ class WARPManagerGUI:
         
         for backup in self.manager.list_backups():
             try:
+                # DirEntry caches the stat from list_backups: one stat per backup
                 stat = backup.stat()
                 size = f"{stat.st_size // 1024} KB"
                 date = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
                 
                 self.backups_store.append([backup.name, date, size])
             except Exception as e:
-                print(f"Error reading backup {backup}: {e}")
+                print(f"Error reading backup {backup.name}: {e}")
     
     def run(self):
         """Run the GUI"""
@@ -652,19 +1054,30 @@ def main():
     parser.add_argument("--reset", action="store_true", help="Reset WARP data (safe mode)")
     parser.add_argument("--delete-db", action="store_true", help="Delete local database")
     parser.add_argument("--list", action="store_true", help="List backups")
+    parser.add_argument(
+        "--compression", choices=list(COMPRESSION_LEVELS), default="balanced",
+        help="Compression tier for --snapshot/--backup: fast (zstd 3, quickest), "
+             "balanced (zstd 15, default, much smaller archives), max (zstd 22, smallest but slowest)"
+    )
+    parser.add_argument(
+        "--writer", choices=["tarfile", "libarchive"], default="tarfile",
+        help="Archive writer for --snapshot/--backup: tarfile (default, checksummed zstd frames) "
+             "or libarchive (native, needs python-libarchive-c and libarchive >= 3.6)"
+    )
     
     args = parser.parse_args()
     
     manager = WARPManager()
+    compression_level = COMPRESSION_LEVELS[args.compression]
     
     if args.cli or any([args.snapshot, args.backup, args.restore, args.reset, args.delete_db, args.list]):
         # CLI Mode
         if args.snapshot:
-            result = manager.take_snapshot()
+            result = manager.take_snapshot(compression_level, args.writer)
             print(f"Snapshot: {result}")
             
         elif args.backup:
-            result = manager.backup_selective(args.backup)
+            result = manager.backup_selective(args.backup, compression_level, args.writer)
             print(f"Backup: {result}")
             
         elif args.restore: